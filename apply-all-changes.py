@@ -5,8 +5,7 @@ Zastosuj wszystkie wcześniejsze zmiany: tłumaczenie, zmiana tytułu, menu, itp
 
 import re
 
-def apply_all_changes():
-    html_path = "www_ever_clean/www.ever.co.id/index.html"
+def apply_all_changes(html_path="www_ever_clean/www.ever.co.id/index.html"):
     
     print("Czytanie pliku HTML...")
     with open(html_path, 'r', encoding='utf-8') as f:
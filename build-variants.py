@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Multi-Variant Build Script
+- Builds every locale / device-tier variant of the page from the pristine
+  index.html.backup instead of rewriting index.html in place
+- Runs the variants in parallel across a process pool
+- Writes variants/variants.json, which server.py uses to pick a variant
+- Builds into temporary files and swaps everything into place at the end,
+  so a running server never sees a half-built page
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SOURCE_PATH = "www_ever_clean/www.ever.co.id/index.html.backup"
+OUTPUT_DIR = "www_ever_clean/www.ever.co.id/variants"
+SW_PATH = "www_ever_clean/www.ever.co.id/sw.js"
+DEFAULT_LOCALE = "pl"
+
+# (script, function) pairs, applied in order to the variant file
+LOCALE_STAGES = {
+    # Polish massage salon, in the order index.html was produced: the
+    # rebranding runs first so it still sees the original "Ever" title and
+    # links. The current scripts translate a few menu/service names that
+    # the checked-in index.html still has in English.
+    "pl": [
+        ("fix-and-remove-ever.py", "fix_and_remove_ever"),
+        ("transform-to-massage.py", "transform_to_massage"),
+        ("apply-all-changes.py", "apply_all_changes"),
+    ],
+    # Add a locale here only once it has its own copy; server.py falls back
+    # to DEFAULT_LOCALE for every other Accept-Language
+}
+
+COMMON_STAGES = [
+    ("optimize-complete.py", "optimize_html"),
+    ("defer-tracking.py", "defer_tracking"),
+    ("image-placeholders.py", "add_placeholders"),
+]
+
+DEVICE_STAGES = {
+    "desktop": [
+        ("lazy-lottie.py", "lazy_lottie"),
+    ],
+    # Lightweight tier from DEVICE_OPTIMIZATIONS.md: no Lottie, no GSAP
+    "mobile": [
+        ("build-variants.py", "strip_heavy_features"),
+    ],
+}
+
+# Run after everything else has finished rewriting the markup
+FINAL_STAGES = [
+    ("minify-html.py", "minify_html"),
+]
+
+# Scripts that only drive animations; nothing else on the page calls them.
+# Anything built on GSAP has to go with it or it throws on load.
+HEAVY_SCRIPTS = [
+    r'https://cdn\.jsdelivr\.net/npm/gsap@[^"]+',
+    r'https://cdnjs\.cloudflare\.com/ajax/libs/gsap/[^"]+',
+    r'https://gfluo\.b-cdn\.net/[^"]+',
+    r'https://unpkg\.com/split-type',
+    r'https://cdn\.jsdelivr\.net/gh/flowtricks/scripts@[^"]+/variables-color-scroll\.js',
+]
+
+MOBILE_CSS = '''<style>
+/* Mobile variant: GSAP is not loaded, show animated elements as-is */
+[data-gsap] { visibility: visible !important; opacity: 1 !important; }
+</style>'''
+
+
+def load_stage(script, function):
+    """Import a function from one of the hyphen-named build scripts"""
+    module_name = script[:-3].replace('-', '_')
+    spec = importlib.util.spec_from_file_location(module_name, script)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so stages with their own process pools can pickle functions
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return getattr(module, function)
+
+
+def strip_heavy_features(html_path):
+    """Remove Lottie and GSAP-driven animation from a variant"""
+    with open(html_path, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    print("Removing Lottie animations...")
+    html = re.sub(r'\s*data-animation-type="lottie"', '', html)
+    html = re.sub(r'\s*data-src="[^"]*\.json"', '', html)
+
+    print("Removing GSAP scripts...")
+    for pattern in HEAVY_SCRIPTS:
+        html = re.sub(r'<script[^>]*src="' + pattern + r'"[^>]*></script>\s*', '', html)
+    # Inline code that drives the removed libraries
+    html = re.sub(r'<script>(?:(?!</script>).)*?\b(?:gsap|CustomEase)\.(?:(?!</script>).)*</script>', '', html, flags=re.DOTALL)
+
+    html = html.replace('</head>', MOBILE_CSS + '\n</head>', 1)
+
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+
+def variant_name(locale, device):
+    return f"index.{locale}.{device}.html"
+
+
+def build_variant(source, locale, device):
+    """Build one variant into a temp file; returns (name, tmp_path, size, seconds, log)"""
+    started = time.perf_counter()
+    name = variant_name(locale, device)
+    # server.py serves the real file name; it is only replaced once complete
+    html_path = os.path.join(OUTPUT_DIR, f"{name}.{os.getpid()}.tmp")
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(source)
+
+    # Stages print progress; keep each variant's output together
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            for script, function in LOCALE_STAGES[locale] + COMMON_STAGES + DEVICE_STAGES[device] + FINAL_STAGES:
+                print(f"--- {script}")
+                stage = load_stage(script, function)
+                if function == "optimize_html":
+                    stage(html_path, write_report=False)
+                else:
+                    stage(html_path)
+    except Exception:
+        os.remove(html_path)
+        raise
+
+    return name, html_path, os.path.getsize(html_path), time.perf_counter() - started, log.getvalue()
+
+
+def build_variants(verbose=False):
+    print("Reading pristine source...")
+    with open(SOURCE_PATH, 'r', encoding='utf-8') as f:
+        source = f.read()
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    jobs = [(locale, device) for locale in LOCALE_STAGES for device in DEVICE_STAGES]
+    print(f"\n=== BUILDING {len(jobs)} VARIANTS ===")
+    started = time.perf_counter()
+
+    manifest = {"default_locale": DEFAULT_LOCALE, "variants": []}
+    built = {}
+    with ProcessPoolExecutor() as pool:
+        futures = [pool.submit(build_variant, source, locale, device) for locale, device in jobs]
+        for (locale, device), future in zip(jobs, futures):
+            name, tmp_path, size, seconds, log = future.result()
+            if verbose:
+                print(log)
+            print(f"  ✓ {name}: {size:,} bytes in {seconds:.2f}s")
+            manifest["variants"].append({"locale": locale, "device": device, "file": name})
+            built[name] = tmp_path
+
+    # One worker serves every variant, so it is generated from all of them
+    print("\nGenerating service worker...")
+    sw_tmp = f"{SW_PATH}.{os.getpid()}.tmp"
+    with contextlib.redirect_stdout(io.StringIO()):
+        load_stage("generate-service-worker.py", "generate_service_worker")(list(built.values()), sw_tmp)
+
+    # Swap the finished files in: pages first, then the worker and the
+    # manifest that point at them, and only then drop stale variants
+    for name, tmp_path in built.items():
+        os.replace(tmp_path, os.path.join(OUTPUT_DIR, name))
+    os.replace(sw_tmp, SW_PATH)
+    manifest_path = os.path.join(OUTPUT_DIR, "variants.json")
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    for name in os.listdir(OUTPUT_DIR):
+        if name.endswith('.html') and name not in built:
+            os.remove(os.path.join(OUTPUT_DIR, name))
+
+    print(f"\n✓ Built {len(jobs)} variants in {time.perf_counter() - started:.2f}s")
+    print(f"✓ Manifest saved to: {os.path.join(OUTPUT_DIR, 'variants.json')}")
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        build_variants(verbose='-v' in sys.argv)
+    except Exception as e:
+        print(f"\n✗ Error during variant build: {e}")
+        import traceback
+        traceback.print_exc()
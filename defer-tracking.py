@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Deferred Tracking Script
+- Rewrites the GTM, gtag and Facebook pixel snippets so their scripts load
+  only after the first user interaction (or once the page has gone idle)
+- Installs dataLayer / fbq queues so events fired before then are not lost
+- Reports how many third-party bytes left the initial load
+"""
+
+import re
+import os
+
+HTML_PATH = "www_ever_clean/www.ever.co.id/index.html"
+
+# Load tags after this long on an idle page even if the user never interacts
+IDLE_TIMEOUT_MS = 4000
+
+# Local mirror of the third-party scripts, used to measure what we deferred
+TRACKING_MIRRORS = {
+    "gtm.js": "www_ever_clean/www.googletagmanager.com/gtm.js",
+    "gtag/js": "www_ever_clean/www.googletagmanager.com/gtag/js.html",
+    "fbevents.js": "www_ever_clean/connect.facebook.net/en_US/fbevents.js",
+    "pixel configs": "www_ever_clean/connect.facebook.net/signals/config",
+}
+
+FBEVENTS_SRC = "https://connect.facebook.net/en_US/fbevents.js"
+
+MARKER = "<!-- Deferred tracking loader -->"
+
+# Runs queued tag loaders on first interaction or after load + idle.
+# window.deferTag(fn) runs fn immediately once the trigger has fired.
+# fbevents.js is requested only once something actually calls fbq.
+DEFER_LOADER = MARKER + '''
+<script>
+(function(w,d){
+  var q=[],fired=false,ev=["pointerdown","keydown","touchstart","scroll","mousemove"];
+  function fire(){
+    if(fired)return;fired=true;
+    ev.forEach(function(e){w.removeEventListener(e,fire,{passive:true});});
+    var f;while((f=q.shift()))try{f();}catch(err){}
+  }
+  w.deferTag=function(f){fired?f():q.push(f);};
+  ev.forEach(function(e){w.addEventListener(e,fire,{passive:true});});
+  w.addEventListener("load",function(){
+    setTimeout(function(){(w.requestIdleCallback||function(c){c();})(fire,{timeout:1000});},%d);
+  });
+  w.dataLayer=w.dataLayer||[];
+  if(!w.fbq){
+    var requested=false;
+    var n=w.fbq=function(){
+      n.callMethod?n.callMethod.apply(n,arguments):n.queue.push(arguments);
+      if(requested)return;requested=true;
+      w.deferTag(function(){
+        var t=d.createElement("script");t.async=true;t.src="%s";
+        var s=d.getElementsByTagName("script")[0];s.parentNode.insertBefore(t,s);
+      });
+    };
+    if(!w._fbq)w._fbq=n;n.push=n;n.loaded=true;n.version="2.0";n.queue=[];
+  }
+})(window,document);
+</script>''' % (IDLE_TIMEOUT_MS, FBEVENTS_SRC)
+
+
+def mirror_size(path):
+    """Size in bytes of a mirrored file, or of every file in a mirrored directory"""
+    if os.path.isdir(path):
+        return sum(mirror_size(os.path.join(path, name)) for name in os.listdir(path))
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return 0
+
+
+def defer_tracking(html_path=HTML_PATH):
+    print("Reading HTML file...")
+    with open(html_path, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    # The marker comment does not survive minify-html.py, the loader does
+    if MARKER in html or 'w.deferTag=' in html:
+        print("Tracking scripts are already deferred, nothing to do.")
+        return
+
+    print("\n=== DEFERRING TRACKING SCRIPTS ===")
+    deferred = []
+
+    # 1. GTM: keep the dataLayer push, defer only the script insertion
+    print("1. Deferring Google Tag Manager...")
+    gtm_insert = re.compile(
+        r"(j=d\.createElement\(s\),dl=l!='dataLayer'\?'&l='\+l:'';)(j\.async=true;(?:j\.defer=true;)?j\.src=\s*"
+        r"'https://www\.googletagmanager\.com/gtm\.js\?id='\+i\+dl;f\.parentNode\.insertBefore\(j,f\);)"
+    )
+    html, count = gtm_insert.subn(r"\1w.deferTag(function(){\2});", html)
+    if count:
+        deferred.append("gtm.js")
+
+    # 2. gtag.js: the inline gtag() already pushes to dataLayer, so only the
+    #    external <script async src=".../gtag/js?id=..."> needs to move
+    print("2. Deferring gtag.js...")
+    gtag_tag = re.compile(
+        r'<script async src="(https://www\.googletagmanager\.com/gtag/js\?id=[^"]+)"></script>'
+    )
+    html, count = gtag_tag.subn(
+        r'<script>deferTag(function(){var t=document.createElement("script");'
+        r't.async=true;t.src="\1";document.head.appendChild(t);});</script>',
+        html
+    )
+    if count:
+        deferred.append("gtag/js")
+
+    # 3. Facebook pixel: the official snippet already queues calls in fbq.queue,
+    #    only the fbevents.js insertion has to wait
+    print("3. Deferring Facebook pixel...")
+    fb_insert = re.compile(r"(t\.src=v;s=b\.getElementsByTagName\(e\)\[0\];\s*)(s\.parentNode\.insertBefore\(t,s\))")
+    html, count = fb_insert.subn(r"\1f.deferTag(function(){\2})", html)
+    # Without a snippet there is nothing to report; a pixel injected later
+    # by GTM still gets the loader's fbq stub, which fetches fbevents.js on
+    # its first call
+    if count:
+        deferred.append("fbevents.js")
+        deferred.append("pixel configs")
+
+    # 4. Loader has to run before any of the snippets above
+    print("4. Adding deferred tag loader...")
+    if '<!-- Google Tag Manager -->' in html:
+        html = html.replace('<!-- Google Tag Manager -->', DEFER_LOADER + '\n<!-- Google Tag Manager -->', 1)
+    else:
+        html = html.replace('<head>', '<head>' + DEFER_LOADER, 1)
+
+    print("\nSaving file...")
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+    print(f"\n✓ Tracking scripts deferred! File saved to: {html_path}")
+    print("\n=== BYTES REMOVED FROM INITIAL LOAD ===")
+    total = 0
+    for name in deferred:
+        size = mirror_size(TRACKING_MIRRORS[name])
+        total += size
+        print(f"  ✓ {name}: {size:,} bytes")
+    print(f"  Total: {total:,} bytes now load after first interaction or {IDLE_TIMEOUT_MS / 1000:g}s idle")
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        defer_tracking()
+    except Exception as e:
+        print(f"\n✗ Error while deferring tracking: {e}")
+        import traceback
+        traceback.print_exc()
@@ -5,8 +5,7 @@ Napraw stronę i usuń wszystkie EVER w kontrolowany sposób
 
 import re
 
-def fix_and_remove_ever():
-    html_path = "www_ever_clean/www.ever.co.id/index.html"
+def fix_and_remove_ever(html_path="www_ever_clean/www.ever.co.id/index.html"):
     
     print("Czytanie pliku HTML...")
     with open(html_path, 'r', encoding='utf-8') as f:
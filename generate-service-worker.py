@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Service Worker Generator
+- Collects the critical assets of the built page (stylesheets, fonts,
+  main scripts, hero AVIF) into a precache manifest
+- Writes sw.js with cache-first for immutable hashed files and
+  stale-while-revalidate for the page and the other precached assets
+- Cache names are derived from content hashes; old caches are deleted
+  when a new worker activates
+"""
+
+import hashlib
+import json
+import os
+import re
+import urllib.parse
+
+HTML_PATH = "www_ever_clean/www.ever.co.id/index.html"
+SW_PATH = "www_ever_clean/www.ever.co.id/sw.js"
+MIRROR_ROOT = "www_ever_clean"
+
+CACHE_PREFIX = "masaze-"
+
+FONT_EXTENSIONS = ('.woff2', '.woff', '.ttf', '.otf')
+HERO_PATTERN = re.compile(r'Main-Header[^"\')]*\.avif', re.IGNORECASE)
+
+# Loaded after first interaction by defer-tracking.py, never precached
+SKIP_HOSTS = ('www.googletagmanager.com', 'connect.facebook.net')
+
+# URLs whose content can never change without the URL changing too
+IMMUTABLE_PATTERNS = [
+    r'/[0-9a-f]{24}(?:_|/)',                # Webflow asset ids
+    r'\.[0-9a-f]{8,}\.(?:js|css)(?:\?|$)',  # Webflow bundle hashes
+    r'@\d+\.\d+\.\d+/',                     # versioned npm / gh packages
+    r'/_DataURI/data\.[0-9a-f]{14}\.',      # blobs from minify-html.py
+]
+
+MARKER = "serviceWorker.register"
+
+REGISTER_SNIPPET = '''<script>
+if("serviceWorker" in navigator){window.addEventListener("load",function(){navigator.serviceWorker.register("/sw.js",{scope:"/"});});}
+</script>'''
+
+SW_TEMPLATE = '''// Generated by generate-service-worker.py - do not edit by hand
+const VERSION = %(version)s;
+const PRECACHE = "%(prefix)sprecache-" + VERSION;
+const PAGES = "%(prefix)spages-" + VERSION;
+const PRECACHE_URLS = %(precache)s;
+const IMMUTABLE = [%(immutable)s];
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches.open(PRECACHE).then((cache) =>
+      Promise.all(PRECACHE_URLS.map((url) =>
+        // CORS so the cached copy also satisfies @font-face and
+        // crossorigin/integrity script requests
+        fetch(new Request(url, { mode: "cors", credentials: "omit" }))
+          .then((response) => response.ok && cache.put(url, response))
+          .catch(() => {})  // one missing asset must not block install
+      ))
+    ).then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    caches.keys().then((names) => Promise.all(
+      names
+        .filter((name) => name.startsWith("%(prefix)s") && name !== PRECACHE && name !== PAGES)
+        .map((name) => caches.delete(name))
+    )).then(() => self.clients.claim())
+  );
+});
+
+function isImmutable(url) {
+  return IMMUTABLE.some((pattern) => pattern.test(url));
+}
+
+// The browser rejects an opaque response for a CORS request (fonts,
+// crossorigin scripts), so those are only ever answered with real ones
+function usable(request, response) {
+  return response && (response.type !== "opaque" || request.mode === "no-cors");
+}
+
+function store(cache, request, response) {
+  if (response.ok || (response.type === "opaque" && request.mode === "no-cors")) {
+    cache.put(request, response.clone());
+  }
+  return response;
+}
+
+function cacheFirst(request) {
+  return caches.open(PRECACHE).then((cache) => cache.match(request).then((cached) =>
+    usable(request, cached) ? cached : fetch(request).then((response) => store(cache, request, response))
+  ));
+}
+
+function staleWhileRevalidate(event, name) {
+  return caches.open(name).then((cache) => cache.match(event.request).then((cached) => {
+    const network = fetch(event.request).then((response) => store(cache, event.request, response));
+    if (usable(event.request, cached)) {
+      event.waitUntil(network.catch(() => {}));
+      return cached;
+    }
+    return network;
+  }));
+}
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  if (request.method !== "GET") return;
+  const url = new URL(request.url);
+  if (request.mode === "navigate" || (url.origin === self.location.origin && url.pathname === "/index.html")) {
+    event.respondWith(staleWhileRevalidate(event, PAGES));
+  } else if (isImmutable(request.url)) {
+    event.respondWith(cacheFirst(request));
+  } else if (PRECACHE_URLS.includes(request.url)) {
+    // Floating versions (e.g. flickity@2) must keep picking up updates
+    event.respondWith(staleWhileRevalidate(event, PRECACHE));
+  }
+});
+'''
+
+
+def mirror_path(url):
+    """Local mirror path for an absolute asset URL"""
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme not in ('http', 'https'):
+        return None
+    path = os.path.join(MIRROR_ROOT, parsed.netloc, urllib.parse.unquote(parsed.path).lstrip('/'))
+    return path if os.path.isfile(path) else None
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def css_urls(css):
+    return [u.strip('\'"') for u in re.findall(r'url\(([^)]+)\)', css)]
+
+
+def collect_assets(html):
+    """Critical asset URLs of a page, in a stable order"""
+    assets = []
+
+    stylesheets = []
+    for tag in re.findall(r'<link\b[^>]*>', html):
+        href = re.search(r'\shref="?([^"\s>]+)', tag)
+        if href and re.search(r'\srel="?stylesheet\b', tag):
+            stylesheets.append(href.group(1))
+    assets.extend(stylesheets)
+
+    # Fonts and hero image from the stylesheets and inline <style> blocks
+    styles = re.findall(r'<style[^>]*>(.*?)</style>', html, flags=re.DOTALL)
+    for href in stylesheets:
+        local = mirror_path(href)
+        if local:
+            with open(local, 'r', encoding='utf-8', errors='replace') as f:
+                styles.append(f.read())
+    for css in styles:
+        for url in css_urls(css):
+            if url.lower().endswith(FONT_EXTENSIONS) or HERO_PATTERN.search(url):
+                assets.append(url)
+    assets.extend(m.group(0) for m in re.finditer(r'https?://[^"\'\s)]*' + HERO_PATTERN.pattern, html))
+
+    # Render-critical scripts; async ones are not on the critical path
+    for tag in re.findall(r'<script[^>]*\ssrc="?[^"\s>]+[^>]*>', html):
+        if re.search(r'\sasync\b', tag):
+            continue
+        assets.append(re.search(r'\ssrc="?([^"\s>]+)', tag).group(1))
+
+    seen = set()
+    ordered = []
+    for url in assets:
+        if not url.startswith(('http://', 'https://', '/')) or urllib.parse.urlparse(url).netloc in SKIP_HOSTS:
+            continue
+        if url not in seen:
+            seen.add(url)
+            ordered.append(url)
+    return ordered
+
+
+def generate_service_worker(html_paths=(HTML_PATH,), sw_path=SW_PATH):
+    print("Reading HTML files...")
+    pages = {}
+    for html_path in html_paths:
+        with open(html_path, 'r', encoding='utf-8') as f:
+            pages[html_path] = f.read()
+
+    print("\n=== GENERATING SERVICE WORKER ===")
+
+    # 1. Register the worker from every page
+    print("1. Adding service worker registration...")
+    for html_path, html in pages.items():
+        if MARKER not in html:
+            html = html.replace('</body>', REGISTER_SNIPPET + '</body>', 1)
+            with open(html_path, 'w', encoding='utf-8') as f:
+                f.write(html)
+            pages[html_path] = html
+
+    # 2. Precache manifest
+    print("2. Collecting critical assets...")
+    precache = []
+    for html in pages.values():
+        precache.extend(url for url in collect_assets(html) if url not in precache)
+
+    # 3. Version = hash over every precached file and every page
+    print("3. Hashing content...")
+    version = hashlib.sha256()
+    missing = []
+    for url in precache:
+        local = mirror_path(url)
+        if local:
+            version.update(file_hash(local).encode())
+        else:
+            # Not mirrored: the URL is the best content identifier we have
+            version.update(url.encode())
+            missing.append(url)
+    for html_path in sorted(pages):
+        version.update(file_hash(html_path).encode())
+    version = version.hexdigest()[:12]
+
+    # 4. Write sw.js
+    print("4. Writing service worker...")
+    sw = SW_TEMPLATE % {
+        'version': json.dumps(version),
+        'prefix': CACHE_PREFIX,
+        'precache': json.dumps(precache, indent=2),
+        'immutable': ', '.join(f'/{p.replace("/", chr(92) + "/")}/' for p in IMMUTABLE_PATTERNS),
+    }
+    with open(sw_path, 'w', encoding='utf-8') as f:
+        f.write(sw)
+
+    print(f"\n✓ Service worker saved to: {sw_path}")
+    print(f"  ✓ Cache version: {version}")
+    print(f"  ✓ {len(precache)} critical assets precached")
+    for url in missing:
+        print(f"  ! not mirrored locally, versioned by URL: {url}")
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        generate_service_worker()
+    except Exception as e:
+        print(f"\n✗ Error while generating service worker: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Image Placeholder Script
+- Reads the intrinsic size of every mirrored <img> and adds width/height,
+  so the browser reserves space before the image arrives
+- Embeds a tiny blurred preview as the image background (needs Pillow
+  with AVIF support and stops if it is missing; --flat uses a flat colour)
+- Works in parallel and caches results by content hash
+- Reports every <img> it could not resolve in www_ever_clean
+"""
+
+import base64
+import hashlib
+import html as html_lib
+import io
+import json
+import os
+import re
+import struct
+import sys
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+try:
+    from PIL import Image, ImageFilter
+except ImportError:
+    Image = None
+else:
+    try:
+        import pillow_avif  # noqa: F401  AVIF plugin for Pillow < 11.2
+    except ImportError:
+        pass
+
+PILLOW_REQUIREMENT = "Pillow>=11.2"
+
+HTML_PATH = "www_ever_clean/www.ever.co.id/index.html"
+MIRROR_ROOT = "www_ever_clean"
+CACHE_PATH = ".image-placeholder-cache.json"
+# Bump when analyze_image() starts returning new fields
+CACHE_VERSION = 3
+
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_COLOR = "#e9e4dc"
+
+# Formats that are usually opaque; files with an alpha channel are still
+# skipped, since the placeholder would show through them for good
+PLACEHOLDER_FORMATS = ('avif', 'jpeg', 'webp')
+
+# Width/height attributes become a size hint only; CSS still decides the
+# rendered size. :where() keeps this below any class rule on the page.
+# data-lqip marks only images this stage sized, so an author's own
+# height attribute is never overridden.
+PLACEHOLDER_CSS = '''<style>
+/* Image placeholders: keep the aspect ratio from width/height */
+:where(img[data-lqip]) { height: auto; }
+</style>'''
+
+
+def avif_size(data):
+    """Size from the largest 'ispe' property, honouring 'irot'"""
+    sizes = [struct.unpack('>II', data[m.end() + 4:m.end() + 12]) for m in re.finditer(b'ispe', data[:64 * 1024])]
+    if not sizes:
+        return None
+    width, height = max(sizes, key=lambda s: s[0] * s[1])
+    irot = data.find(b'irot', 0, 64 * 1024)
+    if irot != -1 and data[irot + 4] & 0x03 in (1, 3):
+        width, height = height, width
+    return width, height
+
+
+def jpeg_size(data):
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('>HH', data[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack('>H', data[i + 2:i + 4])[0]
+    return None
+
+
+def webp_size(data):
+    chunk = data[12:16]
+    if chunk == b'VP8 ':
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L':
+        bits = int.from_bytes(data[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+    return None
+
+
+def svg_size(data):
+    text = data[:4096].decode('utf-8', errors='replace')
+    tag = re.search(r'<svg\b[^>]*>', text)
+    if not tag:
+        return None
+    width = re.search(r'\swidth="([\d.]+)(?:px)?"', tag.group(0))
+    height = re.search(r'\sheight="([\d.]+)(?:px)?"', tag.group(0))
+    if width and height:
+        return round(float(width.group(1))), round(float(height.group(1)))
+    view_box = re.search(r'\sviewBox="[-\d.]+[\s,]+[-\d.]+[\s,]+([\d.]+)[\s,]+([\d.]+)"', tag.group(0))
+    if view_box:
+        return round(float(view_box.group(1))), round(float(view_box.group(2)))
+    return None
+
+
+def has_alpha(fmt, data):
+    """Whether any part of the image can be transparent"""
+    if fmt == 'avif':
+        # Alpha is an auxiliary image whose auxC property names an alpha URN
+        header = data[:64 * 1024]
+        return b'auxC' in header and b'alpha' in header
+    if fmt == 'webp':
+        chunk = data[12:16]
+        if chunk == b'VP8X':
+            return bool(data[20] & 0x10) or b'ALPH' in data[:64 * 1024]
+        if chunk == b'VP8L':
+            return bool(int.from_bytes(data[21:25], 'little') >> 28 & 1)
+        return False
+    if fmt == 'png':
+        return data[25] in (4, 6) or b'tRNS' in data[:64 * 1024]
+    return fmt in ('gif', 'svg')
+
+
+def image_info(data):
+    """(format, (width, height)) from the file header, without decoding"""
+    if data[4:8] == b'ftyp' and data[8:12] in (b'avif', b'avis', b'mif1'):
+        return 'avif', avif_size(data)
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'png', struct.unpack('>II', data[16:24])
+    if data[:2] == b'\xff\xd8':
+        return 'jpeg', jpeg_size(data)
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif', struct.unpack('<HH', data[6:10])
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp', webp_size(data)
+    if b'<svg' in data[:4096]:
+        return 'svg', svg_size(data)
+    return None, None
+
+
+def check_pillow():
+    """Blurred previews need Pillow, and most mirrored images are AVIF"""
+    if Image is None:
+        raise RuntimeError(f"Pillow is not installed: pip install '{PILLOW_REQUIREMENT}' (or pass --flat)")
+    if '.avif' not in Image.registered_extensions():
+        raise RuntimeError(f"this Pillow cannot decode AVIF: pip install -U '{PILLOW_REQUIREMENT}' (or pass --flat)")
+
+
+def blurred_preview(data):
+    """Tiny blurred WebP as a data URI, or None if Pillow can't decode it"""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img = img.convert('RGB')
+            img.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+            img = img.filter(ImageFilter.GaussianBlur(1))
+            out = io.BytesIO()
+            img.save(out, 'WEBP', quality=40)
+    except Exception:
+        return None
+    return 'data:image/webp;base64,' + base64.b64encode(out.getvalue()).decode('ascii')
+
+
+def analyze_image(path, previews=True):
+    """Worker: dimensions and placeholder for one mirrored file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    fmt, size = image_info(data)
+    alpha = has_alpha(fmt, data)
+    preview = None
+    if previews and fmt in PLACEHOLDER_FORMATS and not alpha:
+        preview = blurred_preview(data)
+    return {'format': fmt, 'size': list(size) if size else None, 'alpha': alpha,
+            'previewed': previews, 'preview': preview}
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def mirror_path(url):
+    """Local mirror path for an absolute image URL"""
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme not in ('http', 'https'):
+        return None
+    path = os.path.join(MIRROR_ROOT, parsed.netloc, urllib.parse.unquote(parsed.path).lstrip('/'))
+    return path if os.path.isfile(path) else None
+
+
+def has_placeholder(tag):
+    """Whether an earlier run already gave this <img> its background"""
+    return 'center/cover no-repeat' in tag or f'background-color:{PLACEHOLDER_COLOR}' in tag
+
+
+def find_attr(tag, name):
+    """(match, value) for an attribute however it is quoted, or (None, None)"""
+    match = re.search(r'\s%s\s*=\s*("[^"]*"|\'[^\']*\'|[^\s"\'=<>`]+)' % name, tag)
+    if not match:
+        return None, None
+    value = match.group(1)
+    if value[0] in '"\'':
+        value = value[1:-1]
+    return match, html_lib.unescape(value)
+
+
+def load_cache():
+    if not os.path.exists(CACHE_PATH):
+        return {}
+    with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+        cache = json.load(f)
+    if cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache['images']
+
+
+def add_placeholders(html_path=HTML_PATH, previews=True):
+    if previews:
+        check_pillow()
+
+    print("Reading HTML file...")
+    with open(html_path, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    print("\n=== IMAGE DIMENSIONS AND PLACEHOLDERS ===")
+    if not previews:
+        print("(--flat: using flat colour placeholders)")
+
+    # 1. Resolve every <img> to its local mirror
+    print("1. Resolving images...")
+    tags = re.findall(r'<img\b[^>]*>', html)
+    sources = {}
+    unresolved = []
+    inline = 0
+    for tag in tags:
+        _, src = find_attr(tag, 'src')
+        if src and src.startswith('data:'):
+            # Inlined by minify-html.py; nothing on disk to measure
+            inline += 1
+            continue
+        local = mirror_path(src) if src else None
+        if local:
+            sources[src] = local
+        else:
+            unresolved.append(src or tag[:80])
+
+    # 2. Hash in parallel, analyze only what the cache has not seen
+    print("2. Analyzing images...")
+    paths = sorted(set(sources.values()))
+    with ThreadPoolExecutor() as pool:
+        hashes = dict(zip(paths, pool.map(hash_file, paths)))
+    cache = load_cache()
+    todo = [path for path in paths if hashes[path] not in cache or (previews and not cache[hashes[path]]['previewed'])]
+    if todo:
+        with ProcessPoolExecutor() as pool:
+            for path, info in zip(todo, pool.map(partial(analyze_image, previews=previews), todo)):
+                cache[hashes[path]] = info
+        # Variants are built in parallel; never leave a half-written cache
+        tmp_path = f"{CACHE_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'images': cache}, f)
+        os.replace(tmp_path, CACHE_PATH)
+    print(f"   {len(paths)} images, {len(paths) - len(todo)} from cache")
+
+    # 3. Rewrite the tags
+    print("3. Adding width/height and placeholders...")
+    sized = 0
+    preview_count = 0
+    transparent = 0
+    undecoded = []
+
+    def rewrite(match):
+        nonlocal sized, preview_count, transparent
+        tag = match.group(0)
+        _, src = find_attr(tag, 'src')
+        if src not in sources or 'data-lqip' in tag or has_placeholder(tag):
+            return tag
+        info = cache[hashes[sources[src]]]
+        if not info['size']:
+            unresolved.append(src)
+            return tag
+
+        attrs = ''
+        if not re.search(r'\s(?:width|height)\s*=', tag):
+            attrs += ' data-lqip width="%d" height="%d"' % tuple(info['size'])
+            sized += 1
+        if info['alpha']:
+            transparent += 1
+        elif info['format'] in PLACEHOLDER_FORMATS:
+            if previews and info['preview']:
+                background = f"background:url({info['preview']}) center/cover no-repeat"
+                preview_count += 1
+            else:
+                if previews:
+                    undecoded.append(src)
+                background = f"background-color:{PLACEHOLDER_COLOR}"
+            style, value = find_attr(tag, 'style')
+            if style:
+                tag = tag.replace(style.group(0), f' style="{html_lib.escape(value.rstrip(";"))};{background}"')
+            else:
+                attrs += f' style="{background}"'
+        return tag[:4] + attrs + tag[4:]
+
+    html = re.sub(r'<img\b[^>]*>', rewrite, html)
+
+    # The selector survives minify-html.py, the rest of the block does not
+    if 'img[data-lqip]' not in html:
+        html = html.replace('</head>', PLACEHOLDER_CSS + '\n</head>', 1)
+
+    print("\nSaving file...")
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+    print(f"\n✓ Image placeholders added! File saved to: {html_path}")
+    print(f"  ✓ {sized} of {len(tags)} images given explicit width/height")
+    print(f"  ✓ {preview_count} blurred previews embedded")
+    print(f"  ✓ {transparent} transparent images left without a placeholder")
+    if inline:
+        print(f"  ✓ {inline} inline data URI images skipped")
+    if undecoded:
+        print(f"\n=== {len(undecoded)} IMAGES PILLOW COULD NOT DECODE (flat colour used) ===")
+        for src in undecoded:
+            print(f"  ! {urllib.parse.unquote(src)}")
+    if unresolved:
+        print(f"\n=== {len(unresolved)} IMAGES NOT RESOLVED IN {MIRROR_ROOT} ===")
+        for src in unresolved:
+            print(f"  ! {urllib.parse.unquote(src)}")
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        add_placeholders(previews='--flat' not in sys.argv)
+    except Exception as e:
+        print(f"\n✗ Error while adding image placeholders: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Lazy Lottie Script
+- Stops Webflow from loading every Lottie animation on startup
+- Adds a small runtime loader that initializes each animation only when it
+  scrolls into view on qualifying devices (tablet/desktop, motion allowed,
+  no data saver)
+- Minifies and pre-compresses the animation JSON when a local mirror exists
+"""
+
+import gzip
+import json
+import os
+import re
+import urllib.parse
+
+HTML_PATH = "www_ever_clean/www.ever.co.id/index.html"
+MIRROR_ROOT = "www_ever_clean"
+
+# Same breakpoint as the mobile rules in optimize-complete.py
+MIN_WIDTH = 768
+
+# Keyframe values are stored with far more precision than is ever visible
+FLOAT_PRECISION = 3
+
+MARKER = "<!-- Lazy Lottie loader -->"
+
+# Restores the Webflow attributes on an element once it is close to the
+# viewport and hands it to Webflow's own lottie module.
+LAZY_LOADER = MARKER + '''
+<script>
+(function(w,d){
+  var ok=w.matchMedia("(min-width: %dpx)").matches
+    &&!w.matchMedia("(prefers-reduced-motion: reduce)").matches
+    &&!(navigator.connection&&navigator.connection.saveData);
+  if(!ok||!("IntersectionObserver" in w))return;
+  function start(el){
+    el.setAttribute("data-animation-type","lottie");
+    el.setAttribute("data-src",el.getAttribute("data-lottie-src"));
+    el.removeAttribute("data-lottie-src");
+    w.Webflow=w.Webflow||[];
+    w.Webflow.push(function(){w.Webflow.require("lottie").createInstance(el);});
+  }
+  var io=new IntersectionObserver(function(entries){
+    entries.forEach(function(e){if(e.isIntersecting){io.unobserve(e.target);start(e.target);}});
+  },{rootMargin:"200px 0px"});
+  d.addEventListener("DOMContentLoaded",function(){
+    d.querySelectorAll('[data-animation-type="lottie-lazy"]').forEach(function(el){io.observe(el);});
+  });
+})(window,document);
+</script>''' % MIN_WIDTH
+
+
+def round_floats(value):
+    """Recursively round floats in parsed Lottie JSON"""
+    if isinstance(value, float):
+        return round(value, FLOAT_PRECISION)
+    if isinstance(value, list):
+        return [round_floats(v) for v in value]
+    if isinstance(value, dict):
+        return {k: round_floats(v) for k, v in value.items()}
+    return value
+
+
+def minify_animation(src):
+    """Write <name>.min.json and its .gz next to the local mirror of src.
+
+    Returns the root-relative URL of the minified file, or None when the
+    animation is not mirrored locally.
+    """
+    url = urllib.parse.urlparse(src)
+    local_path = os.path.join(MIRROR_ROOT, url.netloc, urllib.parse.unquote(url.path).lstrip('/'))
+    if not os.path.isfile(local_path):
+        return None
+
+    with open(local_path, 'r', encoding='utf-8') as f:
+        data = round_floats(json.load(f))
+    minified = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    min_path = re.sub(r'\.json$', '', local_path) + '.min.json'
+    with open(min_path, 'wb') as f:
+        f.write(minified)
+    with gzip.open(min_path + '.gz', 'wb', compresslevel=9) as f:
+        f.write(minified)
+
+    print(f"   {os.path.basename(local_path)}: {os.path.getsize(local_path):,} -> "
+          f"{len(minified):,} bytes ({os.path.getsize(min_path + '.gz'):,} gzipped)")
+    return '/' + urllib.parse.quote(os.path.relpath(min_path, MIRROR_ROOT).replace(os.sep, '/'))
+
+
+def lazy_lottie(html_path=HTML_PATH):
+    print("Reading HTML file...")
+    with open(html_path, 'r', encoding='utf-8') as f:
+        html = f.read()
+
+    if MARKER in html or 'data-lottie-src=' in html:
+        print("Lottie animations are already lazy, nothing to do.")
+        return
+
+    print("\n=== LAZY LOADING LOTTIE ===")
+
+    # 1. Minify mirrored animation JSON
+    print("1. Minifying animation JSON...")
+    sources = sorted(set(re.findall(r'data-animation-type="lottie"[^>]*?data-src="([^"]+)"', html)))
+    minified = {}
+    for src in sources:
+        local_url = minify_animation(src)
+        if local_url:
+            minified[src] = local_url
+        else:
+            print(f"   not mirrored, left on CDN: {urllib.parse.unquote(src.rsplit('/', 1)[-1])}")
+
+    # 2. Swap Webflow's eager attributes for the lazy ones
+    print("2. Gating animations behind the viewport loader...")
+    gated = 0
+    broken = 0
+
+    def gate(match):
+        nonlocal gated, broken
+        tag = match.group(0)
+        src = re.search(r'\sdata-src="([^"]+)"', tag)
+        if not src:
+            # data-src was stripped by fix-and-remove-ever.py; Webflow would
+            # try to load an empty path, so drop the animation entirely
+            broken += 1
+            return tag.replace(' data-animation-type="lottie"', '')
+        gated += 1
+        tag = tag.replace(src.group(0), f' data-lottie-src="{minified.get(src.group(1), src.group(1))}"')
+        return tag.replace('data-animation-type="lottie"', 'data-animation-type="lottie-lazy"')
+
+    html = re.sub(r'<div[^>]*data-animation-type="lottie"[^>]*>', gate, html)
+
+    # 3. Lazy elements keep the existing mobile CSS rules
+    print("3. Updating device CSS selectors...")
+    html = html.replace(
+        '[data-animation-type="lottie"] { display: none !important; }',
+        '[data-animation-type="lottie"], [data-animation-type="lottie-lazy"] { display: none !important; }'
+    )
+
+    # 4. Loader runs before Webflow so queued createInstance calls are picked up
+    print("4. Adding viewport loader...")
+    html = html.replace('</head>', LAZY_LOADER + '\n</head>', 1)
+
+    print("\nSaving file...")
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+    print(f"\n✓ Lottie animations are now lazy! File saved to: {html_path}")
+    print(f"  ✓ {gated} animations load on scroll (min-width {MIN_WIDTH}px, motion allowed)")
+    print(f"  ✓ {len(minified)} of {len(sources)} animation files minified locally")
+    if broken:
+        print(f"  ✓ {broken} animations without a data-src removed")
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        lazy_lottie()
+    except Exception as e:
+        print(f"\n✗ Error while gating Lottie animations: {e}")
+        import traceback
+        traceback.print_exc()
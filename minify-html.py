@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+HTML Minification Script
+- Streams the built page through an HTML parser in fixed-size chunks
+- Merges adjacent inline <style> blocks and minifies inline CSS/JS
+- Collapses whitespace outside <pre>/<textarea>, drops comments and
+  redundant attributes
+- Inlines small mirrored images as data URIs and moves large inline
+  blobs (data URIs, big <style>/<script> blocks) out to hashed files
+- Re-parses the output and keeps the original if any tag would change
+"""
+
+import base64
+import hashlib
+import html as html_lib
+import json
+import mimetypes
+import os
+import re
+import urllib.parse
+from html.parser import HTMLParser
+
+HTML_PATH = "www_ever_clean/www.ever.co.id/index.html"
+MIRROR_ROOT = "www_ever_clean"
+BLOB_DIR = "www_ever_clean/_DataURI"
+
+CHUNK_SIZE = 64 * 1024
+
+# Mirrored images up to this size are inlined as data URIs
+INLINE_MAX_BYTES = 4 * 1024
+
+# Inline data URIs and <style>/<script> bodies above this size are externalized
+EXTERNALIZE_MIN_BYTES = 16 * 1024
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+PRESERVE_TAGS = {'pre', 'textarea'}
+JS_TYPES = {None, '', 'text/javascript', 'application/javascript', 'module'}
+
+# Attribute values that are the browser default anyway
+REDUNDANT_ATTRS = {
+    'script': {'type': 'text/javascript', 'language': 'javascript'},
+    'style': {'type': 'text/css'},
+    'link': {'type': 'text/css'},
+    'form': {'method': 'get'},
+}
+
+WHITESPACE = ' \t\r\n\f\v'
+# Only these collapse in HTML text; U+00A0 and other Unicode spaces do not
+HTML_WHITESPACE = ' \t\n\r\f'
+REGEX_PREFIX = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw', 'yield', 'await'}
+
+
+def is_word_char(c):
+    return c.isalnum() or c in '_$' or ord(c) > 127
+
+
+def skip_string(code, i):
+    """Index just past the quoted string starting at code[i]"""
+    quote = code[i]
+    i += 1
+    while i < len(code):
+        if code[i] == '\\':
+            i += 2
+            continue
+        if code[i] == quote or (code[i] == '\n' and quote != '`'):
+            return i + 1
+        if quote == '`' and code.startswith('${', i):
+            i = skip_template_expression(code, i + 2)
+            continue
+        i += 1
+    return i
+
+
+def skip_template_expression(code, i):
+    """Index just past the closing brace of a ${...} in a template literal"""
+    depth = 1
+    while i < len(code) and depth:
+        c = code[i]
+        if c in '\'"`':
+            i = skip_string(code, i)
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+        i += 1
+    return i
+
+
+def skip_regex(code, i):
+    """Index just past the closing slash of the regex literal at code[i]"""
+    i += 1
+    in_class = False
+    while i < len(code) and code[i] != '\n':
+        c = code[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            return i + 1
+        i += 1
+    return i
+
+
+def minify_js(code):
+    """Strip comments and collapse whitespace, keeping line breaks for ASI"""
+    out = []
+    last = ''
+    last_word = ''
+    pending = ''
+    i = 0
+    n = len(code)
+    while i < n:
+        c = code[i]
+        if c in WHITESPACE:
+            j = i
+            while j < n and code[j] in WHITESPACE:
+                j += 1
+            if '\n' in code[i:j]:
+                pending = '\n'
+            elif not pending:
+                pending = ' '
+            i = j
+            continue
+        if code.startswith('//', i):
+            j = code.find('\n', i)
+            i = n if j == -1 else j
+            continue
+        if code.startswith('/*', i):
+            j = code.find('*/', i + 2)
+            j = n if j == -1 else j + 2
+            pending = '\n' if '\n' in code[i:j] or pending == '\n' else ' '
+            i = j
+            continue
+
+        if pending and last:
+            if pending == '\n':
+                out.append('\n')
+            elif (is_word_char(last) and is_word_char(c)) or (last in '+-' and c in '+-'):
+                out.append(' ')
+        pending = ''
+
+        if c in '\'"`':
+            j = skip_string(code, i)
+        elif c == '/' and (last == '' or last in REGEX_PREFIX or last_word in REGEX_KEYWORDS):
+            j = skip_regex(code, i)
+        elif is_word_char(c):
+            j = i
+            while j < n and is_word_char(code[j]):
+                j += 1
+        else:
+            j = i + 1
+        token = code[i:j]
+        out.append(token)
+        last = token[-1]
+        last_word = token if is_word_char(c) else ''
+        i = j
+    return ''.join(out)
+
+
+def minify_css(css):
+    """Strip comments and whitespace that CSS never needs"""
+    out = []
+    pending = False
+    segment = ''        # text since the last { ; or }
+    i = 0
+    n = len(css)
+    while i < n:
+        c = css[i]
+        if c in WHITESPACE:
+            pending = True
+            i += 1
+            continue
+        if css.startswith('/*', i):
+            j = css.find('*/', i + 2)
+            i = n if j == -1 else j + 2
+            pending = True
+            continue
+        if pending and out and out[-1][-1] not in '{};,>' and c not in '{};,>!':
+            # "color: red" -> "color:red", but never touch "a :hover"
+            if not (out[-1] == ':' and re.fullmatch(r'-{0,2}[A-Za-z][\w-]*:', segment)):
+                out.append(' ')
+                segment += ' '
+        pending = False
+        if c in '\'"':
+            j = skip_string(css, i)
+            out.append(css[i:j])
+            segment += css[i:j]
+            i = j
+            continue
+        if c == '}' and out and out[-1] == ';':
+            out.pop()
+        out.append(c)
+        segment = '' if c in '{;}' else segment + c
+        i += 1
+    return ''.join(out)
+
+
+def mirror_path(url):
+    """Local mirror path for an absolute or root-relative asset URL"""
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme in ('http', 'https'):
+        path = os.path.join(MIRROR_ROOT, parsed.netloc, urllib.parse.unquote(parsed.path).lstrip('/'))
+    elif not parsed.scheme and url.startswith('/') and not url.startswith('//'):
+        path = os.path.join(MIRROR_ROOT, urllib.parse.unquote(parsed.path).lstrip('/'))
+    else:
+        return None
+    return path if os.path.isfile(path) else None
+
+
+def write_blob(content, extension):
+    """Store content under a content-hashed name and return its URL"""
+    name = f"data.{hashlib.sha256(content).hexdigest()[:14]}.{extension}"
+    path = os.path.join(BLOB_DIR, name)
+    if not os.path.exists(path):
+        os.makedirs(BLOB_DIR, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+    return '/' + os.path.relpath(path, MIRROR_ROOT).replace(os.sep, '/')
+
+
+class StreamingMinifier(HTMLParser):
+    """Re-serializes the document to `out` as it is parsed"""
+
+    def __init__(self, out):
+        super().__init__(convert_charrefs=False)
+        self.out = out
+        self.preserve_depth = 0
+        self.raw_tag = None          # 'script' or 'style' while inside one
+        self.raw_attrs = []
+        self.raw_body = []
+        self.pending = None          # (tag, body) inline <style> waiting to be merged
+        self.pending_gap = ''        # whitespace seen after the pending block
+        self.stats = {'comments': 0, 'attributes': 0, 'merged': 0, 'inlined': 0, 'externalized': 0}
+        self.tags = []               # (tag, attrs, self_closing) as emitted, for verify_round_trip()
+
+    # --- output helpers -------------------------------------------------
+
+    def emit(self, text):
+        self.out.write(text)
+
+    def flush_pending(self):
+        if self.pending:
+            tag, body = self.pending
+            self.pending = None
+            self.emit_block(tag, [], body)
+            if self.pending_gap:
+                self.emit(self.pending_gap)
+        self.pending_gap = ''
+
+    def emit_block(self, tag, attrs, body):
+        if not attrs and len(body.encode('utf-8')) >= EXTERNALIZE_MIN_BYTES:
+            self.stats['externalized'] += 1
+            if tag == 'style':
+                url = write_blob(body.encode('utf-8'), 'css')
+                self.emit_tag('link', [('rel', 'stylesheet'), ('href', url)])
+                return
+            url = write_blob(body.encode('utf-8'), 'js')
+            self.emit_tag('script', [('src', url)])
+            self.emit('</script>')
+            return
+        self.emit_tag(tag, attrs)
+        self.emit(f'{body}</{tag}>')
+
+    def emit_tag(self, tag, attrs, self_closing=False):
+        self.tags.append((tag, attrs, self_closing))
+        closing = '/>' if self_closing else '>'
+        self.emit(f'<{tag}{self.format_attrs(tag, attrs, self_closing)}{closing}')
+
+    def format_attrs(self, tag, attrs, self_closing=False):
+        parts = []
+        for index, (name, value) in enumerate(attrs):
+            if value is None:
+                parts.append(f' {name}')
+                continue
+            # An unquoted value directly before "/>" would swallow the slash
+            last = self_closing and index == len(attrs) - 1
+            if not last and re.fullmatch(r'[^\s"\'=<>`]*[^\s"\'=<>`/]', value):
+                parts.append(f' {name}={html_lib.escape(value, quote=False)}')
+            else:
+                parts.append(f' {name}="{html_lib.escape(value, quote=False).replace(chr(34), "&quot;")}"')
+        return ''.join(parts)
+
+    def clean_attrs(self, tag, attrs):
+        redundant = REDUNDANT_ATTRS.get(tag, {})
+        cleaned = []
+        for name, value in attrs:
+            if name in redundant and (value or '').strip().lower() == redundant[name]:
+                self.stats['attributes'] += 1
+                continue
+            if value is not None and value.startswith('data:') and len(value) >= EXTERNALIZE_MIN_BYTES:
+                value = self.externalize_data_uri(value)
+            elif tag == 'img' and name == 'src' and value:
+                value = self.inline_small_asset(value)
+            cleaned.append((name, value))
+        return cleaned
+
+    def externalize_data_uri(self, value):
+        header, _, payload = value[5:].partition(',')
+        mime = header.split(';')[0] or 'text/plain'
+        if header.endswith(';base64'):
+            content = base64.b64decode(payload)
+        else:
+            content = urllib.parse.unquote_to_bytes(payload)
+        self.stats['externalized'] += 1
+        return write_blob(content, (mimetypes.guess_extension(mime) or '.bin').lstrip('.'))
+
+    def inline_small_asset(self, value):
+        path = mirror_path(value)
+        if not path or os.path.getsize(path) > INLINE_MAX_BYTES:
+            return value
+        mime = mimetypes.guess_type(path)[0]
+        if not mime or not mime.startswith('image/'):
+            return value
+        with open(path, 'rb') as f:
+            payload = base64.b64encode(f.read()).decode('ascii')
+        self.stats['inlined'] += 1
+        return f"data:{mime};base64,{payload}"
+
+    # --- parser callbacks -----------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        attrs = self.clean_attrs(tag, attrs)
+        if tag in ('script', 'style'):
+            self.raw_tag = tag
+            self.raw_attrs = attrs
+            self.raw_body = []
+            return
+        self.flush_pending()
+        if tag in PRESERVE_TAGS:
+            self.preserve_depth += 1
+        self.emit_tag(tag, attrs)
+
+    def handle_startendtag(self, tag, attrs):
+        self.flush_pending()
+        attrs = self.clean_attrs(tag, attrs)
+        self.emit_tag(tag, attrs, self_closing=tag not in VOID_TAGS)
+
+    def handle_endtag(self, tag):
+        if tag == self.raw_tag:
+            self.finish_raw_block()
+            return
+        self.flush_pending()
+        if tag in PRESERVE_TAGS and self.preserve_depth:
+            self.preserve_depth -= 1
+        self.emit(f'</{tag}>')
+
+    def finish_raw_block(self):
+        tag, attrs, body = self.raw_tag, self.raw_attrs, ''.join(self.raw_body)
+        self.raw_tag = None
+        attr_map = dict(attrs)
+
+        if tag == 'style':
+            body = minify_css(body)
+        elif 'src' not in attr_map and attr_map.get('type') in JS_TYPES:
+            body = minify_js(body).strip()
+        elif attr_map.get('type') == 'application/ld+json':
+            try:
+                body = json.dumps(json.loads(body), separators=(',', ':'), ensure_ascii=False)
+            except ValueError:
+                pass
+
+        # Scripts are never merged: each inline <script> is its own error
+        # and declaration boundary, and joining them changes behaviour
+        if tag == 'style' and not attrs and self.pending:
+            self.pending = (tag, self.pending[1] + body)
+            self.pending_gap = ''
+            self.stats['merged'] += 1
+            return
+
+        self.flush_pending()
+        if tag == 'style' and not attrs and body:
+            self.pending = (tag, body)
+            return
+        self.emit_block(tag, attrs, body)
+
+    def handle_data(self, data):
+        if self.raw_tag:
+            self.raw_body.append(data)
+            return
+        if self.pending and not data.strip(HTML_WHITESPACE):
+            self.pending_gap = ' ' if data else ''
+            return
+        self.flush_pending()
+        if self.preserve_depth:
+            self.emit(data)
+        else:
+            self.emit(re.sub(r'[ \t\n\r\f]+', lambda m: '\n' if '\n' in m.group(0) else ' ', data))
+
+    def handle_entityref(self, name):
+        self.handle_data(f'&{name};')
+
+    def handle_charref(self, name):
+        self.handle_data(f'&#{name};')
+
+    def handle_comment(self, data):
+        if data.startswith('[if') or data.startswith('<![endif]'):
+            self.flush_pending()
+            self.emit(f'<!--{data}-->')
+            return
+        self.stats['comments'] += 1
+
+    def handle_decl(self, decl):
+        self.flush_pending()
+        self.emit(f'<!{decl}>')
+
+    def unknown_decl(self, data):
+        self.flush_pending()
+        self.emit(f'<![{data}]>')
+
+    def handle_pi(self, data):
+        self.flush_pending()
+        self.emit(f'<?{data}>')
+
+    def close(self):
+        super().close()
+        if self.raw_tag:
+            self.finish_raw_block()
+        self.flush_pending()
+
+
+class TagCollector(HTMLParser):
+    """Records every start tag the way StreamingMinifier.tags does"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.tags = []
+
+    def handle_starttag(self, tag, attrs):
+        self.tags.append((tag, attrs, False))
+
+    def handle_startendtag(self, tag, attrs):
+        self.tags.append((tag, attrs, tag not in VOID_TAGS))
+
+
+def verify_round_trip(path, expected):
+    """Re-parse the minified output and check every tag kept its attributes"""
+    collector = TagCollector()
+    with open(path, 'r', encoding='utf-8') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), ''):
+            collector.feed(chunk)
+    collector.close()
+    for index, (want, got) in enumerate(zip(expected, collector.tags)):
+        if want != got:
+            raise ValueError(f"round trip changed tag #{index}: expected {want}, parsed {got}")
+    if len(expected) != len(collector.tags):
+        raise ValueError(f"round trip changed tag count: {len(expected)} -> {len(collector.tags)}")
+
+
+def minify_html(html_path=HTML_PATH):
+    print("Streaming HTML file...")
+    original_size = os.path.getsize(html_path)
+    tmp_path = html_path + '.min.tmp'
+
+    with open(html_path, 'r', encoding='utf-8') as src, open(tmp_path, 'w', encoding='utf-8') as dst:
+        minifier = StreamingMinifier(dst)
+        while True:
+            chunk = src.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            minifier.feed(chunk)
+        minifier.close()
+
+    # Leave the input untouched if the output would parse differently
+    try:
+        verify_round_trip(tmp_path, minifier.tags)
+    except ValueError:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, html_path)
+    new_size = os.path.getsize(html_path)
+    reduction = original_size - new_size
+    reduction_pct = (reduction / original_size * 100) if original_size > 0 else 0
+
+    stats = minifier.stats
+    print(f"\n✓ Minification complete! File saved to: {html_path}")
+    print(f"  Original size: {original_size:,} bytes")
+    print(f"  New size: {new_size:,} bytes")
+    print(f"  Reduction: {reduction:,} bytes ({reduction_pct:.1f}%)")
+    print("\n=== MINIFICATIONS APPLIED ===")
+    print(f"  ✓ Removed {stats['comments']} comments")
+    print(f"  ✓ Removed {stats['attributes']} redundant attributes")
+    print(f"  ✓ Merged {stats['merged']} adjacent inline <style> blocks")
+    print(f"  ✓ Inlined {stats['inlined']} small images as data URIs")
+    print(f"  ✓ Externalized {stats['externalized']} large inline blobs to {BLOB_DIR}")
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        minify_html()
+    except Exception as e:
+        print(f"\n✗ Error during minification: {e}")
+        import traceback
+        traceback.print_exc()
@@ -7,8 +7,7 @@ Removes loading screen, optimizes scripts, adds device-specific optimizations
 import re
 import os
 
-def optimize_html():
-    html_path = "www_ever_clean/www.ever.co.id/index.html"
+def optimize_html(html_path="www_ever_clean/www.ever.co.id/index.html", write_report=True):
     
     print("Reading HTML file...")
     with open(html_path, 'r', encoding='utf-8') as f:
@@ -145,6 +144,9 @@ def optimize_html():
     print("  ✓ Removed sessionStorage loader checks")
     print("  ✓ Added resource hints for critical CSS")
     
+    if not write_report:
+        return
+    
     # Create optimization report
     report = f"""# Site Optimization Report
 
@@ -6,11 +6,219 @@ Fixes 404 errors by serving files from the correct directories
 
 import http.server
 import socketserver
+import email.utils
+import gzip
+import hashlib
+import json
 import os
+import re
+import threading
+import time
+import traceback
 import urllib.parse
 from pathlib import Path
 
 PORT = 8000
+MAIN_HTML = os.path.join('www_ever_clean', 'www.ever.co.id', 'index.html')
+VARIANTS_DIR = os.path.join('www_ever_clean', 'www.ever.co.id', 'variants')
+SERVICE_WORKER = os.path.join('www_ever_clean', 'www.ever.co.id', 'sw.js')
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+# Pages and the assets warm_cache() found, kept in memory with their gzip
+# variant and validators, keyed by path; an entry is rebuilt when the
+# file's mtime changes. Anything else is read from disk per request.
+_asset_cache = {}
+
+# Filled in by warm_cache(); /readyz reports 503 until ready is True
+_warmup = {'ready': False, 'error': None, 'files': 0, 'bytes': 0, 'gzip_bytes': 0, 'seconds': None}
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+
+
+def content_type_for(filepath):
+    """Determine content type from the file extension"""
+    content_type = 'text/html'
+    if filepath.endswith('.css'):
+        content_type = 'text/css'
+    elif filepath.endswith('.js'):
+        content_type = 'application/javascript'
+    elif filepath.endswith('.json'):
+        content_type = 'application/json'
+    elif filepath.endswith('.png'):
+        content_type = 'image/png'
+    elif filepath.endswith('.jpg') or filepath.endswith('.jpeg'):
+        content_type = 'image/jpeg'
+    elif filepath.endswith('.svg'):
+        content_type = 'image/svg+xml'
+    elif filepath.endswith('.avif'):
+        content_type = 'image/avif'
+    elif filepath.endswith('.woff') or filepath.endswith('.woff2'):
+        content_type = 'font/woff2'
+    elif filepath.endswith('.ttf'):
+        content_type = 'font/ttf'
+    elif filepath.endswith('.otf'):
+        content_type = 'font/otf'
+    return content_type
+
+
+def load_asset(filepath, keep=False):
+    """Return the entry for a file, from the cache when it is kept there"""
+    try:
+        mtime = os.path.getmtime(filepath)
+    except OSError:
+        return None
+    cached = _asset_cache.get(filepath)
+    if cached and cached['mtime'] == mtime:
+        return cached
+    # A changed file that was cached stays cached
+    keep = keep or cached is not None
+    
+    with open(filepath, 'rb') as f:
+        content = f.read()
+    content_type = content_type_for(filepath)
+    
+    # Prefer a pre-compressed sibling (e.g. written by lazy-lottie.py);
+    # compressing is only worth it for entries that stay in memory
+    compressed = None
+    if os.path.isfile(filepath + '.gz'):
+        with open(filepath + '.gz', 'rb') as f:
+            compressed = f.read()
+    elif keep and content_type.startswith(COMPRESSIBLE_TYPES) and len(content) > 1024:
+        compressed = gzip.compress(content, compresslevel=6)
+        if len(compressed) >= len(content):
+            compressed = None
+    
+    digest = hashlib.sha256(content).hexdigest()[:16]
+    asset = {
+        'mtime': mtime,
+        'content': content,
+        'gzip': compressed,
+        'content_type': content_type,
+        # Strong validators must differ per content-coding
+        'etag': '"%s"' % digest,
+        'gzip_etag': '"%s-gzip"' % digest,
+        'last_modified': email.utils.formatdate(mtime, usegmt=True),
+    }
+    if keep:
+        _asset_cache[filepath] = asset
+    return asset
+
+
+def load_variants():
+    """Read the manifest written by build-variants.py, if present"""
+    manifest = load_asset(os.path.join(VARIANTS_DIR, 'variants.json'), keep=True)
+    if manifest is None:
+        return None
+    return json.loads(manifest['content'])
+
+
+def local_path_for(url):
+    """Map a URL referenced by the page to the file do_GET would serve"""
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme in ('http', 'https'):
+        path = os.path.join(parsed.netloc, urllib.parse.unquote(parsed.path).lstrip('/'))
+    elif not parsed.scheme and url.startswith('/') and not url.startswith('//'):
+        path = urllib.parse.unquote(parsed.path).lstrip('/')
+    else:
+        return None
+    for candidate in (os.path.join('www_ever_clean', path), os.path.join('www_ever_clean', 'www.ever.co.id', path)):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def warm_cache():
+    """Pre-load the built pages and every local asset they reference"""
+    started = time.perf_counter()
+    _warmup['error'] = None
+    try:
+        pages = [MAIN_HTML, SERVICE_WORKER]
+        manifest = load_variants()
+        if manifest:
+            pages += [os.path.join(VARIANTS_DIR, v['file']) for v in manifest['variants']]
+        
+        files = set()
+        for page in pages:
+            asset = load_asset(page, keep=True)
+            if asset is None:
+                continue
+            files.add(page)
+            html = asset['content'].decode('utf-8', errors='replace')
+            urls = re.findall(r'(?:src|href|data-lottie-src)=["\']?([^"\'\s>]+)', html)
+            urls += [u.strip('\'"') for u in re.findall(r'url\(([^)]+)\)', html)]
+            urls += [u.split()[0] for s in re.findall(r'srcset="([^"]+)"', html) for u in s.split(',') if u.strip()]
+            urls += re.findall(r'"(https?://[^"]+)"', html)  # precache list in sw.js
+            for url in urls:
+                filepath = local_path_for(url)
+                if filepath and filepath not in files and load_asset(filepath, keep=True):
+                    files.add(filepath)
+    except Exception as e:
+        # Reported by /readyz, which also retries the warm-up
+        _warmup['error'] = f"{type(e).__name__}: {e}"
+        print(f"✗ Cache warm-up failed: {_warmup['error']}")
+        traceback.print_exc()
+        return
+    
+    _warmup['files'] = len(files)
+    _warmup['bytes'] = sum(len(_asset_cache[f]['content']) for f in files)
+    _warmup['gzip_bytes'] = sum(len(_asset_cache[f]['gzip'] or _asset_cache[f]['content']) for f in files)
+    _warmup['seconds'] = round(time.perf_counter() - started, 3)
+    _warmup['ready'] = True
+    print(f"Cache warm: {_warmup['files']} files, {_warmup['bytes']:,} bytes ({_warmup['gzip_bytes']:,} gzipped) in {_warmup['seconds']}s")
+
+
+def start_warmup():
+    """Run warm_cache() in the background unless it is already running"""
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread and _warmup_thread.is_alive():
+            return
+        _warmup_thread = threading.Thread(target=warm_cache, daemon=True)
+        _warmup_thread.start()
+
+
+def is_mobile_request(headers):
+    """Device hint: the Sec-CH-UA-Mobile client hint, else the User-Agent"""
+    hint = headers.get('Sec-CH-UA-Mobile')
+    if hint is not None:
+        return hint.strip() == '?1'
+    return re.search(r'Mobi|Android|iPhone', headers.get('User-Agent', '')) is not None
+
+
+def quality_values(header):
+    """(token, q) pairs from an Accept-* header; q defaults to 1"""
+    values = []
+    for part in header.split(','):
+        token, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if token.strip():
+            values.append((token.strip().lower(), quality))
+    return values
+
+
+def accepts_gzip(accept_encoding):
+    """Whether gzip is acceptable; q=0 means the client refuses it"""
+    qualities = dict(quality_values(accept_encoding))
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+
+def preferred_locale(accept_language, available, default):
+    """Best available locale for an Accept-Language header"""
+    choices = []
+    for tag, quality in quality_values(accept_language):
+        language = tag.split('-')[0]
+        if language in available and quality > 0:
+            choices.append((quality, language))
+    if choices:
+        return max(choices, key=lambda choice: choice[0])[1]
+    return default
+
 
 class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     def __init__(self, *args, **kwargs):
@@ -25,16 +233,27 @@ class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         if path.startswith('/'):
             path = path[1:]
         
+        # Load balancer probes: alive as soon as the socket accepts,
+        # ready once warm_cache() has finished
+        if path == 'healthz':
+            return self.send_probe(200, {'status': 'ok'})
+        if path == 'readyz':
+            if _warmup['ready']:
+                return self.send_probe(200, dict(_warmup, status='ready'))
+            error = _warmup['error']
+            if error:
+                start_warmup()
+                return self.send_probe(503, {'status': 'failed', 'error': error})
+            return self.send_probe(503, {'status': 'warming'})
+        
+        # Service worker generated by generate-service-worker.py
+        if path == 'sw.js':
+            return self.serve_service_worker()
+        
         # If root or index, serve the main HTML file
         if path == '' or path == '/' or path == 'index.html':
             # Try to serve from www_ever_clean/www.ever.co.id/index.html
-            main_html = os.path.join('www_ever_clean', 'www.ever.co.id', 'index.html')
-            if os.path.exists(main_html):
-                self.send_response(200)
-                self.send_header('Content-type', 'text/html')
-                self.end_headers()
-                with open(main_html, 'rb') as f:
-                    self.wfile.write(f.read())
+            if self.serve_main_page():
                 return
         
         # Check if file exists in www_ever_clean directory structure
@@ -42,7 +261,7 @@ class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         if path.startswith('cdn.'):
             # Try to find in www_ever_clean
             full_path = os.path.join('www_ever_clean', path)
-            if os.path.exists(full_path):
+            if os.path.isfile(full_path):
                 return self.serve_file(full_path)
         
         # Handle other common paths
@@ -58,59 +277,129 @@ class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         
         # If not found, try to serve from www_ever_clean directory
         www_path = os.path.join('www_ever_clean', path)
-        if os.path.exists(www_path):
+        if os.path.isfile(www_path):
             return self.serve_file(www_path)
         
         # 404 - but try to serve main page anyway
-        main_html = os.path.join('www_ever_clean', 'www.ever.co.id', 'index.html')
-        if os.path.exists(main_html):
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            with open(main_html, 'rb') as f:
-                self.wfile.write(f.read())
+        if self.serve_main_page():
             return
         
         # Real 404
         self.send_error(404, "File not found")
     
-    def serve_file(self, filepath):
-        """Serve a file with appropriate content type"""
+    def do_HEAD(self):
+        # Same routing as GET; send_asset/send_probe skip the body
+        self.do_GET()
+    
+    def choose_variant(self):
+        """Pick the built variant for this request's language and device"""
         try:
-            with open(filepath, 'rb') as f:
-                content = f.read()
+            manifest = load_variants()
+            if not manifest:
+                return None
             
-            # Determine content type
-            content_type = 'text/html'
-            if filepath.endswith('.css'):
-                content_type = 'text/css'
-            elif filepath.endswith('.js'):
-                content_type = 'application/javascript'
-            elif filepath.endswith('.json'):
-                content_type = 'application/json'
-            elif filepath.endswith('.png'):
-                content_type = 'image/png'
-            elif filepath.endswith('.jpg') or filepath.endswith('.jpeg'):
-                content_type = 'image/jpeg'
-            elif filepath.endswith('.svg'):
-                content_type = 'image/svg+xml'
-            elif filepath.endswith('.avif'):
-                content_type = 'image/avif'
-            elif filepath.endswith('.woff') or filepath.endswith('.woff2'):
-                content_type = 'font/woff2'
-            elif filepath.endswith('.ttf'):
-                content_type = 'font/ttf'
-            elif filepath.endswith('.otf'):
-                content_type = 'font/otf'
+            device = 'mobile' if is_mobile_request(self.headers) else 'desktop'
+            locales = [v['locale'] for v in manifest['variants'] if v['device'] == device]
+            locale = preferred_locale(self.headers.get('Accept-Language', ''), locales, manifest['default_locale'])
             
-            self.send_response(200)
-            self.send_header('Content-type', content_type)
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(content)
+            for variant in manifest['variants']:
+                if variant['locale'] == locale and variant['device'] == device:
+                    return variant
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            # A broken manifest must not take the page down with it
+            print(f"✗ Ignoring unreadable variants.json: {type(e).__name__}: {e}")
+        return None
+    
+    def serve_main_page(self):
+        """Serve the best matching variant, or the single built index.html"""
+        variant = self.choose_variant()
+        asset = None
+        if variant:
+            asset = load_asset(os.path.join(VARIANTS_DIR, variant['file']), keep=True)
+        if asset is None:
+            # No manifest, or it names a file that is not there
+            variant = None
+            asset = load_asset(MAIN_HTML, keep=True)
+        if asset is None:
+            return False
+        
+        headers = {'Content-type': 'text/html; charset=utf-8'}
+        if variant:
+            headers['Content-Language'] = variant['locale']
+            headers['Vary'] = 'Accept-Language, Sec-CH-UA-Mobile, User-Agent, Accept-Encoding'
+            headers['Accept-CH'] = 'Sec-CH-UA-Mobile'
+        self.send_asset(asset, headers)
+        return True
+    
+    def serve_service_worker(self):
+        """Serve sw.js for the whole site and make browsers always revalidate it"""
+        asset = load_asset(SERVICE_WORKER, keep=True)
+        if asset is None:
+            self.send_error(404, "Service worker not generated")
+            return
+        self.send_asset(asset, {
+            'Content-type': 'application/javascript',
+            'Service-Worker-Allowed': '/',
+            'Cache-Control': 'no-cache, no-store, must-revalidate',
+        })
+    
+    def serve_file(self, filepath):
+        """Serve a file with appropriate content type"""
+        try:
+            asset = load_asset(filepath)
+            self.send_asset(asset, {
+                'Content-type': asset['content_type'],
+                'Access-Control-Allow-Origin': '*',
+            })
         except Exception as e:
             self.send_error(500, f"Error serving file: {str(e)}")
     
+    def send_asset(self, asset, headers):
+        """Send a cached asset, honouring If-None-Match and Accept-Encoding"""
+        content = asset['content']
+        etag = asset['etag']
+        encoding = None
+        if asset['gzip'] is not None and accepts_gzip(self.headers.get('Accept-Encoding', '')):
+            content = asset['gzip']
+            etag = asset['gzip_etag']
+            encoding = 'gzip'
+        
+        headers = dict(headers, ETag=etag)
+        if asset['gzip'] is not None and 'Vary' not in headers:
+            headers['Vary'] = 'Accept-Encoding'
+        
+        if_none_match = self.headers.get('If-None-Match', '')
+        if if_none_match.strip() == '*' or etag in [t.strip().removeprefix('W/') for t in if_none_match.split(',')]:
+            self.send_response(304)
+            for name, value in headers.items():
+                if name != 'Content-type':
+                    self.send_header(name, value)
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Last-Modified', asset['last_modified'])
+        self.send_header('Content-Length', str(len(content)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(content)
+    
+    def send_probe(self, status, body):
+        content = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Cache-Control', 'no-store')
+        if status == 503:
+            self.send_header('Retry-After', '1')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(content)
+    
     def log_message(self, format, *args):
         """Override to show cleaner logs"""
         print(f"{self.address_string()} - {format % args}")
@@ -120,11 +409,14 @@ if __name__ == "__main__":
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
     
     Handler = CustomHTTPRequestHandler
+    socketserver.TCPServer.allow_reuse_address = True
     
     with socketserver.TCPServer(("", PORT), Handler) as httpd:
         print(f"Server running at http://localhost:{PORT}/")
         print(f"Serving from: {os.getcwd()}")
         print("Press Ctrl+C to stop the server")
+        # The socket already accepts; /readyz turns 200 once this finishes
+        start_warmup()
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
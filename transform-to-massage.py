@@ -7,8 +7,7 @@ Changes title, descriptions, and content to massage salon theme
 import re
 import os
 
-def transform_to_massage():
-    html_path = "www_ever_clean/www.ever.co.id/index.html"
+def transform_to_massage(html_path="www_ever_clean/www.ever.co.id/index.html"):
     
     print("Reading HTML file...")
     with open(html_path, 'r', encoding='utf-8') as f: